@@ -1,8 +1,18 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import os
+import threading
+import time
 
 service_b = Flask(__name__)
 CORS(service_b)
@@ -18,40 +28,241 @@ service_b.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 service_b.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(service_b)
 
+# Shared keep-alive session for calls to the user service
+_HTTP = requests.Session()
+_HTTP.mount('http://', HTTPAdapter(pool_connections=32, pool_maxsize=64, max_retries=0))
+
+# Runs the user service fetch in /tasks/stats while the local queries execute
+_STATS_POOL = ThreadPoolExecutor(max_workers=4)
+
+# Recent user-existence checks, least recently used first: {user_id: (exists, expires_at)}
+_USER_CACHE = OrderedDict()
+_USER_CACHE_LOCK = threading.Lock()
+_USER_CACHE_MAX = 1024
+_USER_CACHE_TTL = 60.0
+_USER_CACHE_NEGATIVE_TTL = 5.0
+
+def user_exists(user_id):
+    """Check a user against the user service, reusing recent answers"""
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        hit = _USER_CACHE.get(user_id)
+        if hit is not None:
+            if hit[1] > now:
+                _USER_CACHE.move_to_end(user_id)
+                return hit[0]
+            del _USER_CACHE[user_id]
+
+    response = _HTTP.get(f'http://localhost:5001/users/{user_id}', timeout=2)
+    exists = response.status_code == 200
+    # Only definite answers are cached; negatives expire quickly so new users show up
+    if exists or response.status_code == 404:
+        ttl = _USER_CACHE_TTL if exists else _USER_CACHE_NEGATIVE_TTL
+        with _USER_CACHE_LOCK:
+            _USER_CACHE[user_id] = (exists, now + ttl)
+            _USER_CACHE.move_to_end(user_id)
+            if len(_USER_CACHE) > _USER_CACHE_MAX:
+                _USER_CACHE.popitem(last=False)
+    return exists
+
+# Keep bulk statements under SQLite's bound-variable limit
+BULK_CHUNK_SIZE = 500
+
+# Short-lived cache for /tasks/stats, cleared by every write endpoint
+# 'gen' is bumped on every invalidation so a stats request that started before
+# a write cannot store its (now stale) body afterwards
+_STATS_CACHE = {'ts': 0, 'body': None, 'gen': 0}
+_STATS_CACHE_LOCK = threading.Lock()
+_STATS_TTL = 2.0
+
+def invalidate_stats_cache():
+    with _STATS_CACHE_LOCK:
+        _STATS_CACHE['gen'] += 1
+        _STATS_CACHE['ts'] = 0
+
+# Stats timestamp, formatted at most once per second: (epoch_second, iso_string)
+_TIMESTAMP_CACHE = (0, '')
+
+def now_iso():
+    global _TIMESTAMP_CACHE
+    second = int(time.time())
+    if second != _TIMESTAMP_CACHE[0]:
+        _TIMESTAMP_CACHE = (second, datetime.fromtimestamp(second).isoformat())
+    return _TIMESTAMP_CACHE[1]
+
+def orjson_response(obj, status=200):
+    """Serialize with orjson, much faster than jsonify on large payloads"""
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection: WAL journal so readers don't block writers, fewer fsyncs on commit"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA busy_timeout=5000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA cache_size=-20000')
+    cursor.close()
+    # Let SQLAlchemy emit BEGIN itself (see begin_sqlite_transaction)
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(Engine, 'begin')
+def begin_sqlite_transaction(conn):
+    """Start transactions as DEFERRED, or IMMEDIATE when the caller asked for a write lock"""
+    mode = conn.get_execution_options().get('sqlite_begin', 'DEFERRED')
+    conn.exec_driver_sql(f'BEGIN {mode}')
+
+def begin_write():
+    """Take the write lock up front so writes never upgrade a read transaction mid-way"""
+    db.session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
 class Task(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     user_id = db.Column(db.Integer, nullable=False)
 
+    __table_args__ = (db.Index('ix_task_user_id', 'user_id'),)
+
+class TaskCounter(db.Model):
+    """Per-user task count, kept in step with Task by every write so /tasks/stats never scans Task"""
+    user_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (db.Index('ix_task_counter_count', 'count'),)
+
+def adjust_task_counters(deltas):
+    """Apply {user_id: change} to the counters inside the current transaction"""
+    rows = [{'user_id': user_id, 'count': delta} for user_id, delta in deltas.items() if delta]
+    if not rows:
+        return
+    stmt = sqlite_insert(TaskCounter).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id'],
+        set_={'count': TaskCounter.count + stmt.excluded.count}
+    )
+    db.session.execute(stmt)
+    # Only decrements can empty a counter
+    if any(row['count'] < 0 for row in rows):
+        TaskCounter.query.filter(TaskCounter.count <= 0).delete(synchronize_session=False)
+
+def rebuild_task_counters():
+    """Recompute every counter from the Task table"""
+    begin_write()
+    TaskCounter.query.delete()
+    db.session.execute(
+        insert(TaskCounter).from_select(
+            ['user_id', 'count'],
+            select(Task.user_id, func.count(Task.id)).group_by(Task.user_id)
+        )
+    )
+    db.session.commit()
+
 @service_b.route('/tasks', methods=['POST'])
 def create_task():
     data = request.get_json()
     if not data or not data.get('title') or not data.get('user_id'):
         return jsonify({'error': 'Datos inválidos'}), 400
+    # Accept an int or a digit-only string, and use the int from here on
+    user_id = data['user_id']
+    if isinstance(user_id, str) and user_id.isascii() and user_id.isdigit():
+        user_id = int(user_id)
+    if not isinstance(user_id, int) or isinstance(user_id, bool) or not user_id:
+        return jsonify({'error': 'Datos inválidos'}), 400
     try:
-        user_check = requests.get(f'http://localhost:5001/users/{data["user_id"]}')
+        valid_user = user_exists(user_id)
     except Exception as e:
         return jsonify({'error': f'Error de conexión al verificar usuario: {str(e)}'}), 500
 
-    if user_check.status_code != 200:
+    if not valid_user:
         return jsonify({'error': 'ID de usuario inválido'}), 400
 
-    task = Task(title=data['title'], user_id=data['user_id'])
-    db.session.add(task)
-    db.session.commit()
+    try:
+        begin_write()
+        task = Task(title=data['title'], user_id=user_id)
+        db.session.add(task)
+        adjust_task_counters({task.user_id: 1})
+        db.session.commit()
+        invalidate_stats_cache()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
     return jsonify({'id': task.id, 'title': task.title, 'user_id': task.user_id}), 201
 
+@service_b.route('/tasks/bulk', methods=['POST'])
+def create_tasks_bulk():
+    """Create many tasks with one user check and one transaction"""
+    data = request.get_json()
+    if not data or not isinstance(data.get('tasks'), list) or not data['tasks']:
+        return jsonify({'error': 'Datos inválidos'}), 400
+    
+    tasks = data['tasks']
+    for t in tasks:
+        if not isinstance(t, dict) or not isinstance(t.get('title'), str) or not t['title']:
+            return jsonify({'error': 'Datos inválidos'}), 400
+        user_id = t.get('user_id')
+        if not isinstance(user_id, int) or isinstance(user_id, bool) or not user_id:
+            return jsonify({'error': 'Datos inválidos'}), 400
+    
+    unique_user_ids = list({t['user_id'] for t in tasks})
+    try:
+        users_response = _HTTP.post('http://localhost:5001/users/exists', json={'ids': unique_user_ids}, timeout=2)
+        users_response.raise_for_status()
+        existing_ids = set(users_response.json()['existing_ids'])
+    except Exception as e:
+        return jsonify({'error': f'Error de conexión al verificar usuario: {str(e)}'}), 500
+    
+    invalid_ids = [uid for uid in unique_user_ids if uid not in existing_ids]
+    if invalid_ids:
+        return jsonify({'error': 'ID de usuario inválido', 'invalid_user_ids': invalid_ids}), 400
+    
+    try:
+        begin_write()
+        stmt = insert(Task).returning(Task.id, Task.title, Task.user_id, sort_by_parameter_order=True)
+        created = []
+        for start in range(0, len(tasks), BULK_CHUNK_SIZE):
+            chunk = [{'title': t['title'], 'user_id': t['user_id']} for t in tasks[start:start + BULK_CHUNK_SIZE]]
+            created.extend(db.session.execute(stmt, chunk).all())
+        
+        deltas = {}
+        for t in tasks:
+            deltas[t['user_id']] = deltas.get(t['user_id'], 0) + 1
+        adjust_task_counters(deltas)
+        db.session.commit()
+        invalidate_stats_cache()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return orjson_response([{'id': r[0], 'title': r[1], 'user_id': r[2]} for r in created], status=201)
+
 @service_b.route('/tasks', methods=['GET'])
 def get_tasks():
-    tasks = Task.query.all()
-    return jsonify([{'id': t.id, 'title': t.title, 'user_id': t.user_id} for t in tasks])
+    def generate():
+        # Stream one chunk per 500-row batch so the full list is never held in memory
+        rows = db.session.execute(select(Task.id, Task.title, Task.user_id).execution_options(yield_per=500))
+        sep = b'['
+        for part in rows.partitions():
+            yield sep + b','.join(orjson.dumps({'id': r[0], 'title': r[1], 'user_id': r[2]}) for r in part)
+            sep = b','
+        yield b'[]' if sep == b'[' else b']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @service_b.route('/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
+    # Cheap read first so a 404 never takes the write lock
+    if Task.query.get(task_id) is None:
+        return jsonify({'error': 'Task not found'}), 404
+    db.session.rollback()
+    begin_write()
+    # Re-read inside the IMMEDIATE transaction in case it was deleted meanwhile
     task = Task.query.get(task_id)
     if task:
         db.session.delete(task)
+        adjust_task_counters({task.user_id: -1})
         db.session.commit()
+        invalidate_stats_cache()
         return jsonify({'message': f'Task {task_id} deleted successfully'}), 200
     return jsonify({'error': 'Task not found'}), 404
 
@@ -59,8 +270,11 @@ def delete_task(task_id):
 def cleanup_tasks():
     """Delete all tasks - for testing purposes only"""
     try:
+        begin_write()
         num_deleted = Task.query.delete()
+        TaskCounter.query.delete()
         db.session.commit()
+        invalidate_stats_cache()
         return jsonify({'message': f'Deleted {num_deleted} tasks'}), 200
     except Exception as e:
         db.session.rollback()
@@ -78,14 +292,17 @@ def cleanup_specific_tasks():
         if not isinstance(task_ids, list):
             return jsonify({'error': 'task_ids must be a list'}), 400
         
+        # One bulk DELETE per chunk, all inside a single transaction
+        begin_write()
         deleted_count = 0
-        for task_id in task_ids:
-            task = Task.query.get(task_id)
-            if task:
-                db.session.delete(task)
-                deleted_count += 1
-        
+        for start in range(0, len(task_ids), BULK_CHUNK_SIZE):
+            chunk = task_ids[start:start + BULK_CHUNK_SIZE]
+            per_user = db.session.query(Task.user_id, func.count(Task.id)).filter(Task.id.in_(chunk)).group_by(Task.user_id).all()
+            deleted_count += Task.query.filter(Task.id.in_(chunk)).delete(synchronize_session=False)
+            adjust_task_counters({user_id: -count for user_id, count in per_user})
+
         db.session.commit()
+        invalidate_stats_cache()
         return jsonify({'message': f'Deleted {deleted_count} specific tasks'}), 200
     except Exception as e:
         db.session.rollback()
@@ -94,28 +311,32 @@ def cleanup_specific_tasks():
 @service_b.route('/tasks/stats', methods=['GET'])
 def get_task_stats():
     """Get task statistics - useful for system monitoring and dashboards"""
+    if _STATS_CACHE['body'] and time.monotonic() - _STATS_CACHE['ts'] < _STATS_TTL:
+        return Response(_STATS_CACHE['body'], status=200, mimetype='application/json')
+
+    generation = _STATS_CACHE['gen']
     try:
-        from datetime import datetime
-        from collections import Counter
-        
-        total_tasks = Task.query.count()
+        # Start the user service call first so it overlaps with the DB queries
+        users_future = _STATS_POOL.submit(_HTTP.get, 'http://localhost:5001/users', timeout=2)
         
-        # Get all tasks for analysis
-        all_tasks = Task.query.all()
-        tasks_data = [{'id': t.id, 'title': t.title, 'user_id': t.user_id} for t in all_tasks]
-        
-        # Count tasks per user
-        user_task_counts = Counter(task.user_id for task in all_tasks)
-        users_with_tasks = len(user_task_counts)
+        # Totals and top users come from the maintained per-user counters
+        total_tasks, users_with_tasks = db.session.query(
+            func.coalesce(func.sum(TaskCounter.count), 0), func.count(TaskCounter.user_id)
+        ).one()
+        top_counters = db.session.query(TaskCounter.user_id, TaskCounter.count).order_by(
+            TaskCounter.count.desc(), TaskCounter.user_id
+        ).limit(3).all()
         
         # Get recent tasks (last 5)
-        recent_tasks = Task.query.order_by(Task.id.desc()).limit(5).all()
-        recent_tasks_data = [{'id': t.id, 'title': t.title, 'user_id': t.user_id} for t in recent_tasks]
+        recent_tasks = db.session.execute(
+            select(Task.id, Task.title, Task.user_id).order_by(Task.id.desc()).limit(5)
+        ).all()
+        recent_tasks_data = [{'id': r[0], 'title': r[1], 'user_id': r[2]} for r in recent_tasks]
         
         # Try to get user information
         user_service_stats = {'total_users': 0, 'error': None}
         try:
-            users_response = requests.get('http://localhost:5001/users', timeout=2)
+            users_response = users_future.result(timeout=2.5)
             if users_response.status_code == 200:
                 users_data = users_response.json()
                 user_service_stats['total_users'] = len(users_data)
@@ -136,11 +357,11 @@ def get_task_stats():
         
         # Most productive users (top 3)
         top_users = []
-        for user_id, task_count in user_task_counts.most_common(3):
+        for user_id, task_count in top_counters:
             top_users.append({'user_id': user_id, 'task_count': task_count})
         
         stats = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'tasks': {
                 'total_tasks': total_tasks,
                 'users_with_tasks': users_with_tasks,
@@ -158,12 +379,32 @@ def get_task_stats():
             }
         }
         
-        return jsonify(stats), 200
+        response = orjson_response(stats)
+        with _STATS_CACHE_LOCK:
+            if _STATS_CACHE['gen'] == generation:
+                _STATS_CACHE['body'] = response.get_data()
+                _STATS_CACHE['ts'] = time.monotonic()
+        return response
         
     except Exception as e:
         return jsonify({'error': f'Failed to get task statistics: {str(e)}'}), 500
 
-if __name__ == '__main__':
+_initialized = False
+
+def init_app():
+    """Create the schema and rebuild counters; runs on import so WSGI servers get it too"""
+    global _initialized
+    if _initialized:
+        return
     with service_b.app_context():
         db.create_all()
+        # create_all skips existing tables, so add indexes missing from older databases
+        for index in Task.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+        rebuild_task_counters()
+    _initialized = True
+
+init_app()
+
+if __name__ == '__main__':
     service_b.run(port=5002)
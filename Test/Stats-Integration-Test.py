@@ -16,6 +16,7 @@ import requests
 import json
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Add the Test directory to Python path to import test utilities
@@ -44,6 +45,17 @@ class StatsIntegrationTest:
         if details:
             print(f"   Details: {details}")
     
+    def post_concurrently(self, session, url, payloads):
+        """POST every payload in parallel over one session; returns (payload, response or exception) in input order"""
+        def post(payload):
+            try:
+                return session.post(url, json=payload, timeout=5)
+            except Exception as e:
+                return e
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            return list(zip(payloads, executor.map(post, payloads)))
+    
     def setup_test_data(self):
         """Create test users and tasks for statistics testing"""
         print("\n=== CONFIGURACIÓN DE DATOS DE PRUEBA ===")
@@ -56,44 +68,43 @@ class StatsIntegrationTest:
             {"name": "David Dashboard"}
         ]
         
-        created_users = []
-        for user_data in test_users:
-            try:
-                response = requests.post(f"{self.base_url_users}/users", json=user_data, timeout=5)
-                if response.status_code == 201:
+        with requests.Session() as session:
+            created_users = []
+            for user_data, response in self.post_concurrently(session, f"{self.base_url_users}/users", test_users):
+                if isinstance(response, Exception):
+                    print(f"❌ Error de conexión creando usuario {user_data['name']}: {str(response)}")
+                elif response.status_code == 201:
                     user = response.json()
                     created_users.append(user)
                     self.tracker.track_user(user['id'])
                     print(f"✅ Usuario creado: {user['name']} (ID: {user['id']})")
                 else:
                     print(f"❌ Error creando usuario {user_data['name']}: {response.text}")
-            except Exception as e:
-                print(f"❌ Error de conexión creando usuario {user_data['name']}: {str(e)}")
-        
-        # Create test tasks with different distribution
-        test_tasks = [
-            {"title": "Task 1 for Alice", "user_id": created_users[0]['id']},
-            {"title": "Task 2 for Alice", "user_id": created_users[0]['id']},
-            {"title": "Task 3 for Alice", "user_id": created_users[0]['id']},  # Alice gets 3 tasks
-            {"title": "Task 1 for Bob", "user_id": created_users[1]['id']},
-            {"title": "Task 2 for Bob", "user_id": created_users[1]['id']},    # Bob gets 2 tasks
-            {"title": "Task 1 for Carol", "user_id": created_users[2]['id']},  # Carol gets 1 task
-            # David gets 0 tasks for testing inactive users
-        ]
         
-        created_tasks = []
-        for task_data in test_tasks:
+            # Create test tasks with different distribution
+            test_tasks = [
+                {"title": "Task 1 for Alice", "user_id": created_users[0]['id']},
+                {"title": "Task 2 for Alice", "user_id": created_users[0]['id']},
+                {"title": "Task 3 for Alice", "user_id": created_users[0]['id']},  # Alice gets 3 tasks
+                {"title": "Task 1 for Bob", "user_id": created_users[1]['id']},
+                {"title": "Task 2 for Bob", "user_id": created_users[1]['id']},    # Bob gets 2 tasks
+                {"title": "Task 1 for Carol", "user_id": created_users[2]['id']},  # Carol gets 1 task
+                # David gets 0 tasks for testing inactive users
+            ]
+        
+            # All tasks go in a single bulk request
+            created_tasks = []
             try:
-                response = requests.post(f"{self.base_url_tasks}/tasks", json=task_data, timeout=5)
+                response = session.post(f"{self.base_url_tasks}/tasks/bulk", json={"tasks": test_tasks}, timeout=5)
                 if response.status_code == 201:
-                    task = response.json()
-                    created_tasks.append(task)
-                    self.tracker.track_task(task['id'])
-                    print(f"✅ Tarea creada: {task['title']} (ID: {task['id']})")
+                    for task in response.json():
+                        created_tasks.append(task)
+                        self.tracker.track_task(task['id'])
+                        print(f"✅ Tarea creada: {task['title']} (ID: {task['id']})")
                 else:
-                    print(f"❌ Error creando tarea {task_data['title']}: {response.text}")
+                    print(f"❌ Error creando tareas en bloque: {response.text}")
             except Exception as e:
-                print(f"❌ Error de conexión creando tarea {task_data['title']}: {str(e)}")
+                print(f"❌ Error de conexión creando tareas en bloque: {str(e)}")
         
         return created_users, created_tasks
     
@@ -329,6 +340,31 @@ class StatsIntegrationTest:
             self.log_result("Statistics Performance", "FAILED", f"Exception: {str(e)}")
             return False
     
+    def test_bulk_task_validation(self):
+        """Test that /tasks/bulk rejects unknown users and malformed user IDs"""
+        print("\n=== PRUEBA DE VALIDACIÓN DE CREACIÓN MASIVA ===")
+        
+        try:
+            unknown_user_id = 999999999
+            response = requests.post(f"{self.base_url_tasks}/tasks/bulk",
+                                     json={"tasks": [{"title": "Orphan task", "user_id": unknown_user_id}]}, timeout=5)
+            if response.status_code != 400 or response.json().get('invalid_user_ids') != [unknown_user_id]:
+                self.log_result("Bulk Unknown User", "FAILED", f"HTTP {response.status_code}: {response.text}")
+                return False
+            
+            response = requests.post(f"{self.base_url_tasks}/tasks/bulk",
+                                     json={"tasks": [{"title": "Malformed task", "user_id": [1]}]}, timeout=5)
+            if response.status_code != 400 or response.json().get('error') != 'Datos inválidos':
+                self.log_result("Bulk Malformed User ID", "FAILED", f"HTTP {response.status_code}: {response.text}")
+                return False
+            
+            self.log_result("Bulk Task Validation", "PASSED", "Unknown and malformed user IDs rejected with HTTP 400")
+            return True
+            
+        except Exception as e:
+            self.log_result("Bulk Task Validation", "FAILED", f"Exception: {str(e)}")
+            return False
+    
     def cleanup_test_data(self):
         """Clean up test data"""
         print("\n=== LIMPIEZA DE DATOS DE PRUEBA ===")
@@ -412,7 +448,7 @@ class StatsIntegrationTest:
         
         # Run all tests
         tests_passed = 0
-        total_tests = 5
+        total_tests = 6
         
         if self.test_user_stats_endpoint():
             tests_passed += 1
@@ -426,6 +462,9 @@ class StatsIntegrationTest:
         if self.test_statistics_performance():
             tests_passed += 1
         
+        if self.test_bulk_task_validation():
+            tests_passed += 1
+        
         # Cleanup and verify
         cleanup_success = self.cleanup_test_data()
         verify_success = self.verify_cleanup()
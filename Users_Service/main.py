@@ -19,6 +19,9 @@ service_a.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
 service_a.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(service_a)
 
+# Keep bulk statements under SQLite's bound-variable limit
+BULK_CHUNK_SIZE = 500
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -42,6 +45,26 @@ def get_user(user_id):
         return jsonify({'id': user.id, 'name': user.name})
     return jsonify({'error': 'User not found'}), 404
 
+@service_a.route('/users/exists', methods=['POST'])
+def users_exist():
+    """Return which of the given IDs belong to existing users - lets other services validate many IDs in one call"""
+    data = request.get_json()
+    if not data or 'ids' not in data:
+        return jsonify({'error': 'ids list is required'}), 400
+    
+    ids = data['ids']
+    if not isinstance(ids, list):
+        return jsonify({'error': 'ids must be a list'}), 400
+    if any(not isinstance(i, int) or isinstance(i, bool) for i in ids):
+        return jsonify({'error': 'ids must be integers'}), 400
+    
+    existing_ids = []
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        chunk = ids[start:start + BULK_CHUNK_SIZE]
+        existing_ids.extend(row[0] for row in db.session.query(User.id).filter(User.id.in_(chunk)))
+    
+    return jsonify({'existing_ids': existing_ids}), 200
+
 @service_a.route('/users', methods=['GET'])
 def list_users():
     users = User.query.all()
@@ -24,6 +24,7 @@ def install_requirements():
         "flask",
         "flask-sqlalchemy", 
         "flask-cors",
+        "orjson",
         "requests",
         "reportlab",
         "selenium",
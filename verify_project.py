@@ -17,7 +17,7 @@ def check_python_packages():
     
     required_packages = [
         'flask', 'flask_sqlalchemy', 'flask_cors', 
-        'requests', 'reportlab', 'selenium'
+        'orjson', 'requests', 'reportlab', 'selenium'
     ]
     
     missing_packages = []